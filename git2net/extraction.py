@@ -13,11 +13,11 @@ import multiprocessing
 import pandas as pd
 from tqdm import tqdm
 import numpy as np
-from scipy.stats import entropy
 
 import pydriller as pydriller
 from pydriller.git_repository import GitCommandError
-from Levenshtein import distance as lev_dist
+from rapidfuzz.distance.Levenshtein import distance as lev_dist
+from rapidfuzz.process import cpdist as lev_cpdist
 import datetime
 
 import pathpy as pp
@@ -25,6 +25,7 @@ import re
 import lizard
 import sys
 import collections
+import functools
 
 #from contextlib import closing
 
@@ -51,77 +52,116 @@ class Alarm(threading.Thread):
             time.sleep (self.timeout)
             thread.interrupt_main()
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """ Fallback if numba is not installed. Functions are executed as regular python code. """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+# number of processed commits that are written to the database in a single transaction
+_COMMITS_PER_TRANSACTION = 500
+
+# types of edits as encoded by _identify_edits_kernel
+_REPLACEMENT = 0
+_DELETION = 1
+_ADDITION = 2
+_EDIT_TYPES = ('replacement', 'deletion', 'addition')
+
 import json
 abs_path = os.path.dirname(__file__)
 rel_path = 'helpers/binary-extensions/binary-extensions.json'
 with open(os.path.join(abs_path, rel_path)) as json_file:
     binary_extensions = json.load(json_file)
 
-def _get_block_length(lines, k):
-    """ Calculates the length (in number of lines) of a edit of added/deleted lines starting in a
-        given line k.
+@njit(cache=True)
+def _in_lines(lines, k):
+    """ Checks if line k is contained in a bitmap of added/deleted lines.
 
     Args:
-        lines: dictionary of added or deleted lines
+        lines: boolean numpy array, True for all added or deleted line numbers
         k: line number to check for
 
     Returns:
-        block_size: number of lines in the contiguously block that was modified
+        in_lines: bool indicating whether k is an added or deleted line
     """
+    return (k >= 0) and (k < len(lines)) and lines[k]
 
-    if k not in lines or (k > 1 and k - 1 in lines):
-        edit = False
-        block_size = 0
-    else:
-        edit = True
-        block_size = 1
 
-    while edit:
-        if k + block_size in lines:
-            block_size += 1
-        else:
-            edit = False
-    return block_size
+@njit(cache=True)
+def _get_block_lengths(lines):
+    """ Calculates the length (in number of lines) of the edits of added/deleted lines starting in
+        every line in a single reverse pass.
 
+    Args:
+        lines: boolean numpy array, True for all added or deleted line numbers
+
+    Returns:
+        block_lengths: numpy array containing the number of lines in the contiguous block that
+                       was modified starting in a given line, 0 if no block starts in the line
+    """
+    run_lengths = np.zeros(len(lines) + 1, dtype=np.int64)
+    for k in range(len(lines) - 1, -1, -1):
+        if lines[k]:
+            run_lengths[k] = run_lengths[k + 1] + 1
+
+    block_lengths = run_lengths[:len(lines)].copy()
+    for k in range(2, len(lines)):
+        if lines[k - 1]:
+            block_lengths[k] = 0
+    return block_lengths
 
-def _identify_edits(deleted_lines, added_lines, use_blocks=False):
-    """ Maps line numbers between the pre- and post-commit version of a modification.
+
+@njit(cache=True)
+def _get_block_length(block_lengths, k):
+    """ Returns the length (in number of lines) of a edit of added/deleted lines starting in a
+        given line k.
 
     Args:
-        deleted_lines: dictionary of deleted lines
-        added_lines: dictionary of added lines
-        use_blocks: bool indicating whether or not to use the block approach
+        block_lengths: block lengths as computed by _get_block_lengths
+        k: line number to check for
 
     Returns:
-        pre_to_post: dictionary mapping line numbers before and after the commit
-        edits: dataframe with information on edits
+        block_size: number of lines in the contiguously block that was modified
     """
+    if (k < 0) or (k >= len(block_lengths)):
+        return 0
+    return block_lengths[k]
 
-    # either deleted or added lines must contain items otherwise there would not be a modification
-    # to process
-    if len(deleted_lines) > 0:
-        max_deleted = max(deleted_lines.keys())
-        min_deleted = min(deleted_lines.keys())
-    else:
-        max_deleted = -1
-        min_deleted = np.inf
 
-    if len(added_lines) > 0:
-        max_added = max(added_lines.keys())
-        min_added = min(added_lines.keys())
-    else:
-        max_added = -1
-        min_added = np.inf
+@njit(cache=True)
+def _identify_edits_kernel(deleted, added, start, max_deleted, max_added, use_blocks):
+    """ Walks through pre- and post-commit line numbers and identifies all edits.
 
-    # create mapping between pre and post edit line numbers
-    pre_to_post = {}
+    Args:
+        deleted: boolean numpy array, True for all deleted line numbers
+        added: boolean numpy array, True for all added line numbers
+        start: first line number at which an addition or deletion occurs
+        max_deleted: largest deleted line number, -1 if no lines were deleted
+        max_added: largest added line number, -1 if no lines were added
+        use_blocks: bool indicating whether or not to use the block approach
 
-    # create DataFrame holding information on edit
-    edits = []
+    Returns:
+        edits: int64 array with one row (pre_start, number_of_deleted_lines, post_start,
+               number_of_added_lines, type) per edit, -1 for fields that are not set
+        pre_to_post: int64 array with one row (pre, post) per line, post is -1 if the line was
+                     deleted
+    """
+    # every iteration increments pre, post, or both
+    size = max_deleted + max_added + 4
+    edits = np.full((size, 5), -1, dtype=np.int64)
+    pre_to_post = np.empty((size, 2), dtype=np.int64)
+    no_of_edits = 0
+    no_of_lines = 0
 
-    # line numbers of lines before the first addition or deletion do not change
-    pre = min(max(min_added, 0), max(min_deleted, 0))
-    post = min(max(min_added, 0), max(min_deleted, 0))
+    if use_blocks:
+        deleted_blocks = _get_block_lengths(deleted)
+        added_blocks = _get_block_lengths(added)
+
+    pre = start
+    post = start
 
     # counters used to match pre and post line number
     no_post_inc = 0
@@ -133,33 +173,24 @@ def _identify_edits(deleted_lines, added_lines, use_blocks=False):
         if use_blocks:
             # compute size of added and deleted edits
             # size is reported as 0 if the line is not in added or deleted lines, respectively
-            length_added_block = _get_block_length(added_lines, post)
-            length_deleted_block = _get_block_length(deleted_lines, pre)
+            length_added_block = _get_block_length(added_blocks, post)
+            length_deleted_block = _get_block_length(deleted_blocks, pre)
 
             # replacement if both deleted and added > 0
             # if not both > 0, deletion if deleted > 0
             # if not both > 0, addition if added > 0
-            if (length_deleted_block > 0) and (length_added_block > 0):
-                edits.append({'pre_start': int(pre),
-                                      'number_of_deleted_lines': int(length_deleted_block),
-                                      'post_start': int(post),
-                                      'number_of_added_lines': int(length_added_block),
-                                      'type': 'replacement'})
-                                    #  ignore_index=True, sort=False)
-            elif length_deleted_block > 0:
-                edits.append({'pre_start': int(pre),
-                                      'number_of_deleted_lines': int(length_deleted_block),
-                                      'post_start': int(post),
-                                      'number_of_added_lines': int(length_added_block),
-                                      'type': 'deletion'})
-                                    #  ignore_index=True, sort=False)
-            elif length_added_block > 0:
-                edits.append({'pre_start': int(pre),
-                                      'number_of_deleted_lines': int(length_deleted_block),
-                                      'post_start': int(post),
-                                      'number_of_added_lines': int(length_added_block),
-                                      'type': 'addition'})
-                                    #  ignore_index=True, sort=False)
+            if (length_deleted_block > 0) or (length_added_block > 0):
+                edits[no_of_edits, 0] = pre
+                edits[no_of_edits, 1] = length_deleted_block
+                edits[no_of_edits, 2] = post
+                edits[no_of_edits, 3] = length_added_block
+                if (length_deleted_block > 0) and (length_added_block > 0):
+                    edits[no_of_edits, 4] = _REPLACEMENT
+                elif length_deleted_block > 0:
+                    edits[no_of_edits, 4] = _DELETION
+                else:
+                    edits[no_of_edits, 4] = _ADDITION
+                no_of_edits += 1
 
             # deleted edit is larger than added edit
             if length_deleted_block > length_added_block:
@@ -170,56 +201,134 @@ def _identify_edits(deleted_lines, added_lines, use_blocks=False):
                 no_pre_inc = length_added_block - length_deleted_block
                 both_inc = length_deleted_block
         else: # no blocks are considered
-            pre_in_deleted = pre in deleted_lines
-            post_in_added = post in added_lines
+            pre_in_deleted = _in_lines(deleted, pre)
+            post_in_added = _in_lines(added, post)
             # cf. case of blocks above
             # length of blocks is equivalent to line being in added or deleted lines
             if pre_in_deleted and post_in_added:
-                edits.append({'pre_start': int(pre),
-                                      'number_of_deleted_lines': int(pre_in_deleted),
-                                      'post_start': int(post),
-                                      'number_of_added_lines': int(post_in_added),
-                                      'type': 'replacement'})
-                                    #  ignore_index=True, sort=False)
+                edits[no_of_edits, 0] = pre
+                edits[no_of_edits, 1] = 1
+                edits[no_of_edits, 2] = post
+                edits[no_of_edits, 3] = 1
+                edits[no_of_edits, 4] = _REPLACEMENT
+                no_of_edits += 1
             elif pre_in_deleted and not post_in_added:
-                edits.append({'pre_start': int(pre),
-                                      'number_of_deleted_lines': int(pre_in_deleted),
-                                      'post_start': None,
-                                      'number_of_added_lines': None,
-                                      'type': 'deletion'})
-                                    #  ignore_index=True, sort=False)
+                edits[no_of_edits, 0] = pre
+                edits[no_of_edits, 1] = 1
+                edits[no_of_edits, 4] = _DELETION
+                no_of_edits += 1
                 no_post_inc += 1
             elif post_in_added and not pre_in_deleted:
-                edits.append({'pre_start': None,
-                                      'number_of_deleted_lines': None,
-                                      'post_start': int(post),
-                                      'number_of_added_lines': int(post_in_added),
-                                      'type': 'addition'})
-                                    #  ignore_index=True, sort=False)
+                edits[no_of_edits, 2] = post
+                edits[no_of_edits, 3] = 1
+                edits[no_of_edits, 4] = _ADDITION
+                no_of_edits += 1
                 no_pre_inc += 1
 
         # increment pre and post counter
         if both_inc > 0:
             both_inc -= 1
-            pre_to_post[pre] = post
+            pre_to_post[no_of_lines, 0] = pre
+            pre_to_post[no_of_lines, 1] = post
+            no_of_lines += 1
             pre += 1
             post += 1
         elif no_post_inc > 0:
             no_post_inc -= 1
-            pre_to_post[pre] = False
+            pre_to_post[no_of_lines, 0] = pre
+            pre_to_post[no_of_lines, 1] = -1
+            no_of_lines += 1
             pre += 1
         elif no_pre_inc > 0:
             no_pre_inc -= 1
             post += 1
         else:
-            pre_to_post[pre] = post
+            pre_to_post[no_of_lines, 0] = pre
+            pre_to_post[no_of_lines, 1] = post
+            no_of_lines += 1
             pre += 1
             post += 1
 
+    return edits[:no_of_edits], pre_to_post[:no_of_lines]
+
+
+def _identify_edits(deleted_lines, added_lines, use_blocks=False):
+    """ Maps line numbers between the pre- and post-commit version of a modification.
+
+    Args:
+        deleted_lines: dictionary of deleted lines
+        added_lines: dictionary of added lines
+        use_blocks: bool indicating whether or not to use the block approach
+
+    Returns:
+        pre_to_post: dictionary mapping line numbers before and after the commit
+        edits: dataframe with information on edits
+    """
+
+    deleted_keys = [int(k) for k in deleted_lines.keys()]
+    added_keys = [int(k) for k in added_lines.keys()]
+
+    # without added or deleted lines there are no edits to identify
+    if (len(deleted_keys) == 0) and (len(added_keys) == 0):
+        return {}, pd.DataFrame()
+
+    max_deleted = max(deleted_keys, default=-1)
+    max_added = max(added_keys, default=-1)
+
+    # line numbers of lines before the first addition or deletion do not change
+    start = min(max(k, 0) for k in deleted_keys + added_keys)
+
+    # added and deleted lines are represented as bitmaps over the line numbers
+    deleted = np.zeros(max_deleted + 2, dtype=np.bool_)
+    deleted[deleted_keys] = True
+    added = np.zeros(max_added + 2, dtype=np.bool_)
+    added[added_keys] = True
+
+    edits_arr, pre_to_post_arr = _identify_edits_kernel(deleted, added, start, max_deleted,
+                                                        max_added, use_blocks)
+
+    # create mapping between pre and post edit line numbers
+    pre_to_post = {int(pre): (int(post) if post >= 0 else False) for pre, post in pre_to_post_arr}
+
+    # create DataFrame holding information on edit
+    edits = []
+    for pre, deleted_block, post, added_block, edit_type in edits_arr:
+        edits.append({'pre_start': int(pre) if pre >= 0 else None,
+                      'number_of_deleted_lines': int(deleted_block) if deleted_block >= 0 else None,
+                      'post_start': int(post) if post >= 0 else None,
+                      'number_of_added_lines': int(added_block) if added_block >= 0 else None,
+                      'type': _EDIT_TYPES[edit_type]})
+
     edits = pd.DataFrame(edits)
     return pre_to_post, edits
 
 
+@functools.lru_cache(maxsize=256)
+def _get_edits(git_repo, diff, use_blocks=False):
+    """ Parses the diff of a modification and identifies the edits made with it. Results are cached
+        so that diffs analysed repeatedly, e.g. by get_unified_changes after mining, are processed
+        only once. The returned objects must not be modified.
+
+    Args:
+        git_repo: pydriller GitRepository object
+        diff: diff of the modification
+        use_blocks: bool indicating whether or not to use the block approach
+
+    Returns:
+        deleted_lines: dictionary of deleted lines
+        added_lines: dictionary of added lines
+        pre_to_post: dictionary mapping line numbers before and after the commit
+        edits: dataframe with information on edits
+    """
+    parsed_lines = git_repo.parse_diff(diff)
+
+    deleted_lines = { x[0]:x[1] for x in parsed_lines['deleted'] }
+    added_lines = { x[0]:x[1] for x in parsed_lines['added'] }
+
+    pre_to_post, edits = _identify_edits(deleted_lines, added_lines, use_blocks=use_blocks)
+    return deleted_lines, added_lines, pre_to_post, edits
+
+
 def text_entropy(text):
     """ Computes entropy for a given text based on UTF8 alphabet.
 
@@ -230,11 +339,14 @@ def text_entropy(text):
         text_entropy: text entropy of the given string
     """
     # we only consider UTF8 characters to compute the text entropy
-    pk = [text.count(chr(i)) for i in range(256)]
-    if sum(pk) == 0:
+    # code points are counted in a single pass rather than scanning the text once per character
+    code_points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    pk = np.bincount(code_points[code_points < 256], minlength=256)
+    if pk.sum() == 0:
         text_entropy = None
     else:
-        text_entropy = entropy(pk, base=2)
+        pk = pk[pk > 0] / pk.sum()
+        text_entropy = float((pk * np.log2(1 / pk)).sum())
     return text_entropy
 
 
@@ -317,8 +429,65 @@ def _parse_porcelain_blame(blame):
     return blame_info
 
 
+@functools.lru_cache(maxsize=128)
+def _get_blame(git_repo, rev, path, blame_C):
+    """ Runs git blame for a file at a given revision and parses the output. Results are cached as
+        the blame of a file is often required again, e.g. for the parent when processing the child
+        of a commit. The returned dataframe must not be modified.
+
+    Args:
+        git_repo: pydriller GitRepository object
+        rev: revision for which git blame is executed
+        path: path of the file within the repository
+        blame_C: string for the blame C option
+
+    Returns:
+        blame_info: content of blame as pandas dataframe, empty if the file has no content
+    """
+    blame = git_repo.git.blame(rev, _parse_blame_C(blame_C) + ['-w', '--show-number', '--porcelain'],
+                               path)
+    if len(blame) > 0:
+        blame_info = _parse_porcelain_blame(blame)
+    else:
+        blame_info = pd.DataFrame()
+    return blame_info
+
+
+def _get_block(lines, start, length):
+    """ Returns the content of a block of added or deleted lines. For the analysis, lines are
+        concatenated with whitespaces.
+
+    Args:
+        lines: dictionary of added or deleted lines
+        start: line number of the first line in the block
+        length: number of lines in the block
+
+    Returns:
+        block: content of the lines in the block
+    """
+    return ' '.join(map(lines.__getitem__, range(start, start + length)))
+
+
+def _add_levenshtein_distances(edits_info):
+    """ Computes the Levenshtein distances deferred by _get_edit_details for all edits of a
+        modification in a single batch.
+
+    Args:
+        edits_info: list of dicts containing information on edits, updated in place
+    """
+    deferred = [e for e in edits_info if '_levenshtein_blocks' in e]
+    if len(deferred) > 0:
+        blocks = [e.pop('_levenshtein_blocks') for e in deferred]
+        # Workers are already parallelised over commits, so the distances use a single thread.
+        distances = lev_cpdist([x[0] for x in blocks], [x[1] for x in blocks],
+                               scorer=lev_dist, workers=1)
+        for e, distance in zip(deferred, distances):
+            e['levenshtein_dist'] = int(distance)
+
+
 def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_parent,
-                      blame_info_commit, use_blocks=False, extract_text=False):
+                      blame_info_commit, use_blocks=False, extract_text=False,
+                      defer_levenshtein=False):
     """ Extracts detailed measures for a given edit.
 
     Args:
@@ -330,6 +499,8 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
         blame_info_commit: blame info for current commit as output from _parse_porcelain_blame
         use_blocks: bool indicating whether or not to use the block approach
         extract_text: extract the commit message and line texts
+        defer_levenshtein: bool, if True the Levenshtein distance of replacements is computed
+                           later by _add_levenshtein_distances
 
     Returns:
         e: pandas dataframe containing information on edits
@@ -337,30 +508,26 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
     # Different actions for different types of edits.
     e = {}
     if edit.type == 'replacement':
+        pre_start = int(edit.pre_start)
+        pre_len_in_lines = int(edit.number_of_deleted_lines)
+        post_start = int(edit.post_start)
+        post_len_in_lines = int(edit.number_of_added_lines)
+
         # For replacements, both the content of the deleted and added block are required in
         # order to compute text entropy, as well as Levenshtein edit distance between them.
-        deleted_block = []
-        for i in range(int(edit.pre_start), int(edit.pre_start + edit.number_of_deleted_lines)):
-            deleted_block.append(deleted_lines[i])
-
-        added_block = []
-        for i in range(int(edit.post_start), int(edit.post_start + edit.number_of_added_lines)):
-            added_block.append(added_lines[i])
-
-        # For the analysis, lines are concatenated with whitespaces.
-        deleted_block = ' '.join(deleted_block)
-        added_block = ' '.join(added_block)
+        deleted_block = _get_block(deleted_lines, pre_start, pre_len_in_lines)
+        added_block = _get_block(added_lines, post_start, post_len_in_lines)
 
         # Given this, all metadata can be written.
         # Data on the content and location of deleted line in the parent commit.
-        e['pre_starting_line_no'] = int(edit.pre_start)
-        e['pre_len_in_lines'] = int(edit.number_of_deleted_lines)
+        e['pre_starting_line_no'] = pre_start
+        e['pre_len_in_lines'] = pre_len_in_lines
         e['pre_len_in_chars'] = len(deleted_block)
         e['pre_entropy'] = text_entropy(deleted_block)
 
         # Data on the content and location of added line in the current commit.
-        e['post_starting_line_no'] = int(edit.post_start)
-        e['post_len_in_lines'] = int(edit.number_of_added_lines)
+        e['post_starting_line_no'] = post_start
+        e['post_len_in_lines'] = post_len_in_lines
         e['post_len_in_chars'] = len(added_block)
         e['post_entropy'] = text_entropy(added_block)
 
@@ -368,7 +535,16 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
         if extract_text:
             e['pre_text'] = deleted_block.encode('utf8','surrogateescape').decode('utf8','replace')
             e['post_text'] = added_block.encode('utf8','surrogateescape').decode('utf8','replace')
-        e['levenshtein_dist'] = lev_dist(deleted_block, added_block)
+        if (len(deleted_block) == 0) or (len(added_block) == 0):
+            # If one block is empty, all characters of the other block need to be typed.
+            e['levenshtein_dist'] = max(len(deleted_block), len(added_block))
+        elif deleted_block == added_block:
+            e['levenshtein_dist'] = 0
+        elif defer_levenshtein:
+            e['levenshtein_dist'] = None
+            e['_levenshtein_blocks'] = (deleted_block, added_block)
+        else:
+            e['levenshtein_dist'] = lev_dist(deleted_block, added_block)
 
         # Data on origin of deleted line. Every deleted line must have an origin
         if use_blocks:
@@ -377,11 +553,11 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
             e['original_file_path_deletion'] = 'not available with use_blocks'
         else:
             assert blame_info_parent is not None
-            e['original_commit_deletion'] = blame_info_parent.at[int(edit.pre_start) - 1,
+            e['original_commit_deletion'] = blame_info_parent.at[pre_start - 1,
                                                                     'original_commit_hash']
-            e['original_line_no_deletion'] = blame_info_parent.at[int(edit.pre_start) - 1,
+            e['original_line_no_deletion'] = blame_info_parent.at[pre_start - 1,
                                                                     'original_line_no']
-            e['original_file_path_deletion'] = blame_info_parent.at[int(edit.pre_start) - 1,
+            e['original_file_path_deletion'] = blame_info_parent.at[pre_start - 1,
                                                                     'original_file_path']
 
         # Data on the origin of added line. Can be either original or copied form other file.
@@ -389,7 +565,7 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
             e['original_commit_addition'] = 'not available with use_blocks'
             e['original_line_no_addition'] = 'not available with use_blocks'
             e['original_file_path_addition'] = 'not available with use_blocks'
-        elif blame_info_commit.at[int(edit.post_start) - 1,
+        elif blame_info_commit.at[post_start - 1,
                                     'original_commit_hash'] == commit.hash:
             # The line is original, there exists no original commit, line number or file path.
             e['original_commit_addition'] = None
@@ -398,25 +574,24 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
         else:
             # The line was copied from somewhere.
             assert blame_info_commit is not None
-            e['original_commit_addition'] = blame_info_commit.at[int(edit.post_start) - 1,
+            e['original_commit_addition'] = blame_info_commit.at[post_start - 1,
                                                                     'original_commit_hash']
-            e['original_line_no_addition'] = blame_info_commit.at[int(edit.post_start) - 1,
+            e['original_line_no_addition'] = blame_info_commit.at[post_start - 1,
                                                                     'original_line_no']
-            e['original_file_path_addition'] = blame_info_commit.at[int(edit.post_start) - 1,
+            e['original_file_path_addition'] = blame_info_commit.at[post_start - 1,
                                                                     'original_file_path']
 
     elif edit.type == 'deletion':
-        # For deletions, only the content of the deleted block is required.
-        deleted_block = []
-        for i in range(int(edit.pre_start), int(edit.pre_start + edit.number_of_deleted_lines)):
-            deleted_block.append(deleted_lines[i])
+        pre_start = int(edit.pre_start)
+        pre_len_in_lines = int(edit.number_of_deleted_lines)
 
-        deleted_block = ' '.join(deleted_block)
+        # For deletions, only the content of the deleted block is required.
+        deleted_block = _get_block(deleted_lines, pre_start, pre_len_in_lines)
 
         # Given this, all metadata can be written.
         # Data on the deleted line in the parent commit.
-        e['pre_starting_line_no'] = int(edit.pre_start)
-        e['pre_len_in_lines'] = int(edit.number_of_deleted_lines)
+        e['pre_starting_line_no'] = pre_start
+        e['pre_len_in_lines'] = pre_len_in_lines
         e['pre_len_in_chars'] = len(deleted_block)
         e['pre_entropy'] = text_entropy(deleted_block)
 
@@ -442,20 +617,19 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
             e['original_file_path_deletion'] = 'not available with use_blocks'
         else:
             assert blame_info_parent is not None
-            e['original_commit_deletion'] = blame_info_parent.at[int(edit.pre_start) - 1,
+            e['original_commit_deletion'] = blame_info_parent.at[pre_start - 1,
                                                                     'original_commit_hash']
-            e['original_line_no_deletion'] = blame_info_parent.at[int(edit.pre_start) - 1,
+            e['original_line_no_deletion'] = blame_info_parent.at[pre_start - 1,
                                                                     'original_line_no']
-            e['original_file_path_deletion'] = blame_info_parent.at[int(edit.pre_start) - 1,
+            e['original_file_path_deletion'] = blame_info_parent.at[pre_start - 1,
                                                                     'original_file_path']
 
     elif edit.type == 'addition':
-        # For additions, only the content of the added block is required.
-        added_block = []
-        for i in range(int(edit.post_start), int(edit.post_start + edit.number_of_added_lines)):
-            added_block.append(added_lines[i])
+        post_start = int(edit.post_start)
+        post_len_in_lines = int(edit.number_of_added_lines)
 
-        added_block = ' '.join(added_block)
+        # For additions, only the content of the added block is required.
+        added_block = _get_block(added_lines, post_start, post_len_in_lines)
 
         # Given this, all metadata can be written.
         # For additions, there is no deleted line.
@@ -468,8 +642,8 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
         e['original_file_path_deletion'] = None
 
         # Data on the added line.
-        e['post_starting_line_no'] = int(edit.post_start)
-        e['post_len_in_lines'] = int(edit.number_of_added_lines)
+        e['post_starting_line_no'] = post_start
+        e['post_len_in_lines'] = post_len_in_lines
         e['post_len_in_chars'] = len(added_block)
         e['post_entropy'] = text_entropy(added_block)
 
@@ -484,7 +658,7 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
             e['original_commit_addition'] = 'not available with use_blocks'
             e['original_line_no_addition'] = 'not available with use_blocks'
             e['original_file_path_addition'] = 'not available with use_blocks'
-        elif blame_info_commit.at[int(edit.post_start) - 1,
+        elif blame_info_commit.at[post_start - 1,
                                     'original_commit_hash'] == commit.hash:
             # The line is original, there exists no original commit, line number or file path.
             e['original_commit_addition'] = None
@@ -493,11 +667,11 @@ def _get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_paren
         else:
             # The line was copied from somewhere.
             assert blame_info_commit is not None
-            e['original_commit_addition'] = blame_info_commit.at[int(edit.post_start) - 1,
+            e['original_commit_addition'] = blame_info_commit.at[post_start - 1,
                                                                     'original_commit_hash']
-            e['original_line_no_addition'] = blame_info_commit.at[int(edit.post_start) - 1,
+            e['original_line_no_addition'] = blame_info_commit.at[post_start - 1,
                                                                     'original_line_no']
-            e['original_file_path_addition'] = blame_info_commit.at[int(edit.post_start) - 1,
+            e['original_file_path_addition'] = blame_info_commit.at[post_start - 1,
                                                                     'original_file_path']
 
     elif (edit.type == 'file_renaming') or (edit.type == 'binary_file_change'):
@@ -614,11 +788,10 @@ def _extract_edits(git_repo, commit, modification, use_blocks=False, blame_C='-C
         deleted_lines = {}
         added_lines = {}
     else:
-        # Parse diff of given modification to extract added and deleted lines
-        parsed_lines = git_repo.parse_diff(modification.diff)
-
-        deleted_lines = { x[0]:x[1] for x in parsed_lines['deleted'] }
-        added_lines = { x[0]:x[1] for x in parsed_lines['added'] }
+        # Parse diff of given modification to extract added and deleted lines and the specific
+        # edits made with them.
+        deleted_lines, added_lines, _, edits = _get_edits(git_repo, modification.diff,
+                                                          use_blocks=use_blocks)
 
         # If there was a modification but no lines were added or removed, the file was renamed.
         if (len(deleted_lines) == 0) and (len(added_lines) == 0):
@@ -627,8 +800,6 @@ def _extract_edits(git_repo, commit, modification, use_blocks=False, blame_C='-C
                                 'post_start': None,
                                 'number_of_added_lines': None,
                                 'type': 'file_renaming'}, index=[0])
-        else: # If there were lines added or deleted, the specific edits are identified.
-            _, edits = _identify_edits(deleted_lines, added_lines, use_blocks=use_blocks)
 
     # In order to trace the origins of lines e execute git blame is executed. For lines that were
     # deleted with the current commit, the blame needs to be executed on the parent commit. As
@@ -641,22 +812,33 @@ def _extract_edits(git_repo, commit, modification, use_blocks=False, blame_C='-C
         if not binary_file:
             if len(deleted_lines) > 0:
                 assert len(commit.parents) == 1
-                blame_parent = git_repo.git.blame(commit.parents[0],
-                                                _parse_blame_C(blame_C) +
-                                                ['-w', '--show-number', '--porcelain'],
-                                                modification.old_path)
-                blame_info_parent = _parse_porcelain_blame(blame_parent)
+                blame_info_parent = _get_blame(git_repo, commit.parents[0],
+                                               modification.old_path, blame_C)
 
             if len(added_lines) > 0:
-                blame_commit = git_repo.git.blame(commit.hash,
-                                                _parse_blame_C(blame_C) +
-                                                ['-w', '--show-number', '--porcelain'],
-                                                modification.new_path)
-                blame_info_commit = _parse_porcelain_blame(blame_commit)
+                blame_info_commit = _get_blame(git_repo, commit.hash, modification.new_path,
+                                               blame_C)
 
     except GitCommandError:
         return pd.DataFrame()
     else:
+        # General information is identical for all edits and thus only extracted once. pydriller
+        # recomputes some of it, e.g. the number of added lines, every time it is accessed.
+        if binary_file:
+            file_info = {'cyclomatic_complexity_of_file': None,
+                         'lines_of_code_in_file': None,
+                         'total_added_lines': None,
+                         'total_removed_lines': None}
+        else:
+            file_info = {'new_path': modification.new_path,
+                         'old_path': modification.old_path,
+                         'cyclomatic_complexity_of_file': modification.complexity,
+                         'lines_of_code_in_file': modification.nloc,
+                         'total_added_lines': modification.added,
+                         'total_removed_lines': modification.removed}
+        filename = modification.filename
+        modification_type = modification.change_type.name
+
         # Next, metadata on all identified edits is extracted and added to a pandas DataFrame.
         l = []
         for _, edit in tqdm(edits.iterrows(), leave=False, desc=commit.hash[0:7] + ' edits 1/1',
@@ -666,28 +848,19 @@ def _extract_edits(git_repo, commit, modification, use_blocks=False, blame_C='-C
             if edit.type == 'binary_file_change':
                 e['new_path'] = edit.new_path
                 e['old_path'] = edit.old_path
-                e['cyclomatic_complexity_of_file'] = None
-                e['lines_of_code_in_file'] = None
-                e['total_added_lines'] = None
-                e['total_removed_lines'] = None
-            else:
-                e['new_path'] = modification.new_path
-                e['old_path'] = modification.old_path
-                e['cyclomatic_complexity_of_file'] = modification.complexity
-                e['lines_of_code_in_file'] = modification.nloc
-                e['total_added_lines'] = modification.added
-                e['total_removed_lines'] = modification.removed
-            e['filename'] = modification.filename
+            e.update(file_info)
+            e['filename'] = filename
             e['commit_hash'] = commit.hash
-            e['modification_type'] = modification.change_type.name
+            e['modification_type'] = modification_type
             e['edit_type'] = edit.type
 
             e.update(_get_edit_details(edit, commit, deleted_lines, added_lines, blame_info_parent,
                                       blame_info_commit, use_blocks=use_blocks,
-                                      extract_text=extract_text))
+                                      extract_text=extract_text, defer_levenshtein=True))
 
             l.append(e)
 
+        _add_levenshtein_distances(l)
         edits_info = pd.DataFrame(l)
         return edits_info
 
@@ -745,7 +918,7 @@ def _extract_edits_merge(git_repo, commit, modification_info, use_blocks=False,
                              'number_of_added_lines': None,
                              'type': 'binary_file_change'}, index=[0])
 
-        edits_info = pd.DataFrame()
+        edits_info = []
         for _, edit in edits.iterrows():
             e = {}
             e['commit_hash'] = commit.hash
@@ -758,21 +931,17 @@ def _extract_edits_merge(git_repo, commit, modification_info, use_blocks=False,
                                           blame_info_commit, use_blocks=use_blocks,
                                           extract_text=extract_text))
 
-
-
-            edits_info = edits_info.append(e, ignore_index=True, sort=False)
-        return edits_info
+            edits_info.append(e)
+        return pd.DataFrame(edits_info)
     else:
         parent_blames = []
         for parent in commit.parents:
             try:
-                parent_blame = git_repo.git.blame(parent,
-                                                  _parse_blame_C(blame_C) +
-                                                        ['-w', '--show-number', '--porcelain'],
-                                                  modification_info['old_path'])
+                parent_blame = _get_blame(git_repo, parent, modification_info['old_path'],
+                                          blame_C)
 
                 if len(parent_blame) > 0:
-                    parent_blame = _parse_porcelain_blame(parent_blame).rename(
+                    parent_blame = parent_blame.rename(
                                     columns={'line_content': 'pre_line_content',
                                             'line_number': 'pre_line_number'})
                     parent_blame.loc[:, 'pre_commit'] = parent
@@ -794,13 +963,11 @@ def _extract_edits_merge(git_repo, commit, modification_info, use_blocks=False,
 
     # Then, the current state of the file is obtained by executing git blame on the current commit.
     try:
-        current_blame = git_repo.git.blame(commit.hash,
-                                           _parse_blame_C(blame_C) +
-                                                ['-w', '--show-number', '--porcelain'],
-                                           modification_info['new_path'])
+        current_blame = _get_blame(git_repo, commit.hash, modification_info['new_path'],
+                                   blame_C)
 
         if len(current_blame) > 0:
-            current_blame = _parse_porcelain_blame(current_blame).rename(
+            current_blame = current_blame.rename(
                                                        columns={'line_content': 'post_line_content',
                                                                 'line_number': 'post_line_number'})
         else:
@@ -883,10 +1050,11 @@ def _extract_edits_merge(git_repo, commit, modification_info, use_blocks=False,
             e.update(modification_info)
             e.update(_get_edit_details(edit, commit, deleted_lines_parents[idx], added_lines,
                                        parent_blames[idx], current_blame, use_blocks=use_blocks,
-                                       extract_text=extract_text))
+                                       extract_text=extract_text, defer_levenshtein=True))
 
             edits_info.append(e)
 
+    _add_levenshtein_distances(edits_info)
     return pd.DataFrame(edits_info)
 
 
@@ -980,6 +1148,36 @@ def _get_edited_file_paths_since_split(git_repo, commit):
     return edited_file_paths
 
 
+# GitRepository object reused by all commits processed in the current process
+_worker = {}
+
+
+def _init_worker(repo_string):
+    """ Opens the git repository once for the current process. Used as initializer of the
+        multiprocessing pool.
+
+    Args:
+        repo_string: path to the git repository that is mined
+    """
+    _worker['repo_string'] = repo_string
+    _worker['git_repo'] = pydriller.GitRepository(repo_string)
+
+
+def _get_git_repo(repo_string):
+    """ Returns the GitRepository object of the current process for a given repository, opening
+        the repository if it was not opened before.
+
+    Args:
+        repo_string: path to the git repository that is mined
+
+    Returns:
+        git_repo: pydriller GitRepository object
+    """
+    if _worker.get('repo_string') != repo_string:
+        _init_worker(repo_string)
+    return _worker['git_repo']
+
+
 def _process_commit(args):
     """ Extracts information on commit and all edits made with the commit.
 
@@ -999,7 +1197,7 @@ def _process_commit(args):
     Returns:
         extracted_result: dict containing two dataframes with information of commit and edits
     """
-    git_repo = pydriller.GitRepository(args['repo_string'])
+    git_repo = _get_git_repo(args['repo_string'])
     commit = git_repo.get_commit(args['commit_hash'])
 
     alarm = Alarm(args['timeout'])
@@ -1027,8 +1225,14 @@ def _process_commit(args):
         c['in_main_branch'] = commit.in_main_branch
         c['branches'] = ','.join(commit.branches)
 
+        # Excluded paths are matched with a single startswith call for all prefixes.
+        exclude_prefixes = tuple(x + os.sep for x in args['exclude_paths'])
+        exclude_files = set(args['exclude_paths'])
+
         # parse modification
-        df_edits = pd.DataFrame()
+        # Edits of each modification are collected in a list and concatenated once at the end, as
+        # appending to a DataFrame copies all previously collected rows.
+        edits_frames = []
         if commit.merge:
             # Git does not create a modification if own changes are accpeted during a merge.
             # Therefore, the edited files are extracted manually.
@@ -1045,10 +1249,8 @@ def _process_commit(args):
             for edited_file_path in tqdm(edited_file_paths, leave=False, desc='\t' +
                                          commit.hash[0:7] + ' mods',
                                          disable=(args['no_of_processes']>1)):
-                exclude_file = False
-                for x in args['exclude_paths']:
-                    if edited_file_path.startswith(x + os.sep) or (edited_file_path == x):
-                        exclude_file = True
+                exclude_file = edited_file_path.startswith(exclude_prefixes) or \
+                               (edited_file_path in exclude_files)
                 if not exclude_file:
                     modification_info = {}
                     try:
@@ -1068,13 +1270,12 @@ def _process_commit(args):
                         modification_info['old_path'] = edited_file_path
                         modification_info['modification_type'] = 'merge_self_accept'
 
-                        df_edits = df_edits.append(_extract_edits_merge(git_repo, commit,
+                        edits_frames.append(_extract_edits_merge(git_repo, commit,
                                                         modification_info,
                                                         use_blocks=args['use_blocks'],
                                                         blame_C=args['blame_C'],
                                                         no_of_processes=args['no_of_processes'],
-                                                        extract_text=args['extract_text']),
-                                                ignore_index=True, sort=True)
+                                                        extract_text=args['extract_text']))
                     except GitCommandError:
                         # A GitCommandError occurs if the file was deleted. In this case it
                         # currently has no content.
@@ -1092,13 +1293,12 @@ def _process_commit(args):
                             modification_info['lines_of_code_in_file'] = 0
                             modification_info['modification_type'] = 'merge_self_accept'
 
-                            df_edits = df_edits.append(_extract_edits_merge(git_repo, commit,
+                            edits_frames.append(_extract_edits_merge(git_repo, commit,
                                                         modification_info,
                                                         use_blocks=args['use_blocks'],
                                                         blame_C=args['blame_C'],
                                                         no_of_processes=args['no_of_processes'],
-                                                        extract_text=args['extract_text']),
-                                                    ignore_index=True, sort=True)
+                                                        extract_text=args['extract_text']))
 
         else:
             if (args['max_modifications'] > 0) and \
@@ -1111,22 +1311,25 @@ def _process_commit(args):
                                      commit.hash[0:7] + ' mods',
                                      disable=(args['no_of_processes']>1)):
                 exclude_file = False
-                for x in args['exclude_paths']:
-                    if modification.new_path:
-                        if modification.new_path.startswith(x + os.sep) or \
-                           (modification.new_path == x):
-                            exclude_file = True
-                    if not exclude_file and modification.old_path:
-                        if modification.old_path.startswith(x + os.sep):
-                            exclude_file = True
+                if modification.new_path:
+                    if modification.new_path.startswith(exclude_prefixes) or \
+                       (modification.new_path in exclude_files):
+                        exclude_file = True
+                if not exclude_file and modification.old_path:
+                    if modification.old_path.startswith(exclude_prefixes):
+                        exclude_file = True
                 if not exclude_file:
-                    df_edits = df_edits.append(_extract_edits(git_repo, commit, modification,
+                    edits_frames.append(_extract_edits(git_repo, commit, modification,
                                                         use_blocks=args['use_blocks'],
                                                         blame_C=args['blame_C'],
                                                         no_of_processes=args['no_of_processes'],
-                                                        extract_text=args['extract_text']),
-                                            ignore_index=True, sort=True)
+                                                        extract_text=args['extract_text']))
 
+        edits_frames = [df for df in edits_frames if not df.empty]
+        if len(edits_frames) > 0:
+            df_edits = pd.concat(edits_frames, ignore_index=True, sort=True)
+        else:
+            df_edits = pd.DataFrame()
 
         df_commit = pd.DataFrame(c, index=[0])
 
@@ -1134,12 +1337,169 @@ def _process_commit(args):
     except KeyboardInterrupt:
         print('Timeout processing commit: ', commit.hash)
         extracted_result = {'commit': pd.DataFrame(), 'edits': pd.DataFrame()}
+        # The interrupted git command may have left the repository in an undefined state.
+        _worker.clear()
 
     del alarm
 
     return extracted_result
 
 
+def _connect_db(sqlite_db_file):
+    """ Opens a connection to the sqlite database that is configured for writing large batches.
+
+    Args:
+        sqlite_db_file: path (including database name) of the sqlite database
+
+    Returns:
+        con: sqlite3 connection to the database
+    """
+    con = sqlite3.connect(sqlite_db_file)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('PRAGMA synchronous=NORMAL')
+    con.execute('PRAGMA temp_store=MEMORY')
+    return con
+
+
+# columns and sqlite types of the commits and edits tables
+_COMMITS_SCHEMA = [('hash', 'TEXT PRIMARY KEY'),
+                   ('author_email', 'TEXT'),
+                   ('author_name', 'TEXT'),
+                   ('committer_email', 'TEXT'),
+                   ('committer_name', 'TEXT'),
+                   ('author_date', 'TEXT'),
+                   ('committer_date', 'TEXT'),
+                   ('author_timezone', 'INTEGER'),
+                   ('committer_timezone', 'INTEGER'),
+                   ('no_of_modifications', 'INTEGER'),
+                   ('commit_message_len', 'INTEGER'),
+                   ('commit_message', 'TEXT'),
+                   ('project_name', 'TEXT'),
+                   ('parents', 'TEXT'),
+                   ('merge', 'INTEGER'),
+                   ('in_main_branch', 'INTEGER'),
+                   ('branches', 'TEXT')]
+
+_EDITS_SCHEMA = [('commit_hash', 'TEXT'),
+                 ('new_path', 'TEXT'),
+                 ('old_path', 'TEXT'),
+                 ('filename', 'TEXT'),
+                 ('modification_type', 'TEXT'),
+                 ('cyclomatic_complexity_of_file', 'INTEGER'),
+                 ('lines_of_code_in_file', 'INTEGER'),
+                 ('total_added_lines', 'INTEGER'),
+                 ('total_removed_lines', 'INTEGER'),
+                 ('edit_type', 'TEXT'),
+                 ('pre_starting_line_no', 'INTEGER'),
+                 ('pre_len_in_lines', 'INTEGER'),
+                 ('pre_len_in_chars', 'INTEGER'),
+                 ('pre_entropy', 'REAL'),
+                 ('pre_text', 'TEXT'),
+                 ('post_starting_line_no', 'INTEGER'),
+                 ('post_len_in_lines', 'INTEGER'),
+                 ('post_len_in_chars', 'INTEGER'),
+                 ('post_entropy', 'REAL'),
+                 ('post_text', 'TEXT'),
+                 ('levenshtein_dist', 'INTEGER'),
+                 ('original_commit_deletion', 'TEXT'),
+                 ('original_line_no_deletion', 'TEXT'),
+                 ('original_file_path_deletion', 'TEXT'),
+                 ('original_commit_addition', 'TEXT'),
+                 ('original_line_no_addition', 'TEXT'),
+                 ('original_file_path_addition', 'TEXT')]
+
+# columns that are only stored if the text is extracted
+_TEXT_COLUMNS = {'commit_message', 'pre_text', 'post_text'}
+
+
+def _create_tables(con, extract_text=False):
+    """ Creates the commits and edits tables if they do not exist yet.
+
+    Args:
+        con: sqlite3 connection to the database
+        extract_text: whether the commit message and line texts are stored
+    """
+    for table, schema in [('commits', _COMMITS_SCHEMA), ('edits', _EDITS_SCHEMA)]:
+        columns = ', '.join('"{}" {}'.format(column, sql_type) for column, sql_type in schema
+                            if extract_text or column not in _TEXT_COLUMNS)
+        con.execute('CREATE TABLE IF NOT EXISTS "{}" ({})'.format(table, columns))
+
+
+def _insert_rows(con, table, df, or_ignore=False):
+    """ Inserts all rows of a dataframe into an existing table of the database.
+
+    Args:
+        con: sqlite3 connection to the database
+        table: name of the table the rows are inserted into
+        df: pandas dataframe containing the rows
+        or_ignore: skip rows violating a uniqueness constraint of the table
+    """
+    # sqlite3 can only bind python types, missing values are stored as NULL
+    df = df.astype(object).where(pd.notnull(df), None)
+
+    columns = ', '.join('"{}"'.format(c) for c in df.columns)
+    placeholders = ', '.join('?' for _ in df.columns)
+    con.executemany('INSERT {}INTO "{}" ({}) VALUES ({})'.format('OR IGNORE ' if or_ignore else '',
+                                                                table, columns, placeholders),
+                    df.itertuples(index=False, name=None))
+
+
+def _insert_commits(con, commits):
+    """ Inserts commits into the database. Commits that are already stored are skipped.
+
+    Args:
+        con: sqlite3 connection to the database
+        commits: pandas dataframe with one row per commit
+    """
+    _insert_rows(con, 'commits', commits, or_ignore=True)
+
+
+def _insert_edits(con, edits):
+    """ Inserts edits into the database.
+
+    Args:
+        con: sqlite3 connection to the database
+        edits: pandas dataframe with one row per edit
+    """
+    _insert_rows(con, 'edits', edits)
+
+
+def _write_results(con, results):
+    """ Writes the results of processed commits to the database in a single transaction.
+
+    Args:
+        con: sqlite3 connection to the database
+        results: list of extracted results as returned by _process_commit
+    """
+    commits = [result['commit'] for result in results if not result['commit'].empty]
+    edits = [result['edits'] for result in results if not result['edits'].empty]
+
+    with con:
+        if len(edits) > 0:
+            _insert_edits(con, pd.concat(edits, sort=True))
+        if len(commits) > 0:
+            _insert_commits(con, pd.concat(commits, sort=True))
+
+
+def _create_indices(con):
+    """ Creates indices on the columns used to join the commits and edits tables.
+
+    Args:
+        con: sqlite3 connection to the database
+    """
+    tables = {x[0] for x in con.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    with con:
+        # Tables created before commits.hash became the primary key lack an index on the hash.
+        if 'commits' in tables and \
+           not any(column[1] == 'hash' and column[5] > 0
+                   for column in con.execute('PRAGMA table_info(commits)')):
+            con.execute('CREATE INDEX IF NOT EXISTS ix_commits_hash ON commits (hash)')
+        if 'edits' in tables:
+            con.execute('CREATE INDEX IF NOT EXISTS ix_edits_commit_hash ON edits (commit_hash)')
+            con.execute("""CREATE INDEX IF NOT EXISTS ix_edits_original_commit_deletion
+                           ON edits (original_commit_deletion)""")
+
+
 def _process_repo_serial(repo_string, sqlite_db_file, commits, use_blocks=False,
                          no_of_processes=os.cpu_count(), exclude=None, blame_C='-C',
                          max_modifications=0, timeout=0, extract_text=False):
@@ -1148,7 +1508,7 @@ def _process_repo_serial(repo_string, sqlite_db_file, commits, use_blocks=False,
     Args:
         repo_string: path to the git repository that is mined
         sqlite_db_file: path (including database name) where the sqlite database will be created
-        commits: list of commits that have to be processed
+        commits: list of hashes of the commits that have to be processed
         use_blocks: bool, determins if analysis is performed on block or line basis
         no_of_processes: number of parallel processes that are spawned
         exclude: file paths that are excluded from the analysis
@@ -1167,36 +1527,45 @@ def _process_repo_serial(repo_string, sqlite_db_file, commits, use_blocks=False,
         with open(exclude) as f:
             exclude_paths = [x.strip() for x in f.readlines()]
 
-    df_commits = pd.DataFrame()
-    df_edits = pd.DataFrame()
+    con = _connect_db(sqlite_db_file)
 
-    con = sqlite3.connect(sqlite_db_file)
-
-    for commit in tqdm(commits, desc='Serial'):
-        args = {'repo_string': repo_string, 'commit_hash': commit.hash, 'use_blocks': use_blocks,
-                'exclude_paths': exclude_paths, 'blame_C': blame_C,
-                'no_of_processes': no_of_processes, 'max_modifications': max_modifications,
-                'timeout': timeout, 'extract_text': extract_text}
-        result = _process_commit(args)
-
-        if not result['edits'].empty:
-            result['edits'].to_sql('edits', con, if_exists='append')
-        if not result['commit'].empty:
-            result['commit'].to_sql('commits', con, if_exists='append')
+    # Results are buffered and written in batches to avoid one transaction per commit.
+    results = []
+    try:
+        for commit_hash in tqdm(commits, desc='Serial'):
+            args = {'repo_string': repo_string, 'commit_hash': commit_hash,
+                    'use_blocks': use_blocks, 'exclude_paths': exclude_paths, 'blame_C': blame_C,
+                    'no_of_processes': no_of_processes, 'max_modifications': max_modifications,
+                    'timeout': timeout, 'extract_text': extract_text}
+            results.append(_process_commit(args))
+
+            if len(results) >= _COMMITS_PER_TRANSACTION:
+                batch, results = results, []
+                try:
+                    _write_results(con, batch)
+                except BaseException:
+                    # The rolled back batch is retried when the remaining results are flushed.
+                    results = batch
+                    raise
+    finally:
+        # Results obtained before an interruption are kept so that mining can be resumed.
+        _write_results(con, results)
+        con.close()
 
 
 def _process_repo_parallel(repo_string, sqlite_db_file, commits, use_blocks=False,
-                          no_of_processes=os.cpu_count(), chunksize=1, exclude=None, blame_C='-C',
+                          no_of_processes=os.cpu_count(), chunksize=None, exclude=None, blame_C='-C',
                           max_modifications=0, timeout=0, extract_text=False):
     """ Processes all commits in a given git repository in a parallel manner.
 
     Args:
         repo_string: path to the git repository that is mined
         sqlite_db_file: path (including database name) where the sqlite database will be created
-        commits: list of commits that are already in the database
+        commits: list of hashes of the commits that have to be processed
         use_blocks: bool, determins if analysis is performed on block or line basis
         no_of_processes: number of parallel processes that are spawned
-        chunksize: number of tasks that are assigned to a process at a time
+        chunksize: number of tasks that are assigned to a process at a time, by default every
+                   process is assigned about four chunks
         exclude: file paths that are excluded from the analysis
         blame_C: string for the blame C option
         max_modifications: ignore commit if there are more modifications
@@ -1212,21 +1581,42 @@ def _process_repo_parallel(repo_string, sqlite_db_file, commits, use_blocks=Fals
         with open(exclude) as f:
             exclude_paths = [x.strip() for x in f.readlines()]
 
-    args = [{'repo_string': repo_string, 'commit_hash': commit.hash, 'use_blocks': use_blocks,
+    # The arguments are generated lazily as they are consumed by the pool.
+    args = ({'repo_string': repo_string, 'commit_hash': commit_hash, 'use_blocks': use_blocks,
              'exclude_paths': exclude_paths, 'blame_C': blame_C, 'no_of_processes': no_of_processes,
              'max_modifications': max_modifications, 'timeout': timeout,
              'extract_text': extract_text}
-            for commit in commits]
+            for commit_hash in commits)
 
-    con = sqlite3.connect(sqlite_db_file)
-    with multiprocessing.Pool(no_of_processes) as p:
-        with tqdm(total=len(args), desc='Parallel ({0} processes)'.format(no_of_processes)) as pbar:
-            for result in p.imap_unordered(_process_commit, args, chunksize=chunksize):
-                if not result['edits'].empty:
-                    result['edits'].to_sql('edits', con, if_exists='append')
-                if not result['commit'].empty:
-                    result['commit'].to_sql('commits', con, if_exists='append')
-                pbar.update(1)
+    # Larger chunks reduce the number of round trips between the main and the worker processes.
+    if chunksize is None:
+        chunksize = max(1, len(commits) // (no_of_processes * 4))
+
+    con = _connect_db(sqlite_db_file)
+
+    # Results are buffered and written in batches to avoid one transaction per commit.
+    results = []
+    try:
+        with multiprocessing.Pool(no_of_processes, initializer=_init_worker,
+                                  initargs=(repo_string,)) as p:
+            with tqdm(total=len(commits),
+                      desc='Parallel ({0} processes)'.format(no_of_processes)) as pbar:
+                for result in p.imap_unordered(_process_commit, args, chunksize=chunksize):
+                    results.append(result)
+
+                    if len(results) >= _COMMITS_PER_TRANSACTION:
+                        batch, results = results, []
+                        try:
+                            _write_results(con, batch)
+                        except BaseException:
+                            # The rolled back batch is retried when the remaining results are flushed.
+                            results = batch
+                            raise
+                    pbar.update(1)
+    finally:
+        # Results obtained before an interruption are kept so that mining can be resumed.
+        _write_results(con, results)
+        con.close()
 
 
 def identify_file_renaming(repo_string):
@@ -1284,7 +1674,7 @@ def get_unified_changes(repo_string, commit_hash, file_path):
     Returns:
         df: pandas dataframe listing changes made to file in commit
     """
-    git_repo = pydriller.GitRepository(repo_string)
+    git_repo = _get_git_repo(repo_string)
     commit = git_repo.get_commit(commit_hash)
 
     # Select the correct modifictaion.
@@ -1292,51 +1682,65 @@ def get_unified_changes(repo_string, commit_hash, file_path):
         if modification.new_path == file_path:
             break
 
-    # Parse the diff extracting the lines added and deleted with the given commit.
-    parsed_lines = git_repo.parse_diff(modification.diff)
-
-    deleted_lines = { x[0]:x[1] for x in parsed_lines['deleted'] }
-    added_lines = { x[0]:x[1] for x in parsed_lines['added'] }
-
-    # Indetify the edits made with the changes.
-    pre_to_post, edits = _identify_edits(deleted_lines, added_lines)
+    # Parse the diff extracting the lines added and deleted with the given commit and indetify the
+    # edits made with the changes.
+    deleted_lines, added_lines, pre_to_post, edits = _get_edits(git_repo, modification.diff)
 
     # Extract the source code after the commit.
     post_source_code = modification.source_code.split('\n')
 
+    # Lines at which edits start are collected in sets to allow constant time lookups.
+    pre_starts = set(edits.get('pre_start', []))
+    post_starts = set(edits.get('post_start', []))
+    max_deleted = max(deleted_lines.keys(), default=0)
+    max_added = max(added_lines.keys(), default=0)
+
+    def _continues(pre_idx, post_idx):
+        return post_idx < len(post_source_code) or pre_idx < max_deleted or \
+               post_idx < max_added
+
     # Initialise lists for output.
-    pre_line_no = []
-    post_line_no = []
-    action = []
-    code = []
-
-    # Go through all lines and report on the changes.
-    pre_counter = 1
-    post_counter = 1
-    while post_counter < len(post_source_code) or \
-          pre_counter < max(deleted_lines.keys()) or \
-          post_counter < max(added_lines.keys()):
-        if pre_counter in list(edits.pre_start):
-            pre_line_no.append(pre_counter)
-            post_line_no.append(None)
-            action.append('-')
-            code.append(deleted_lines[pre_counter])
-            pre_counter += 1
-        elif post_counter in list(edits.post_start):
-            pre_line_no.append(None)
-            post_line_no.append(post_counter)
-            action.append('+')
-            code.append(added_lines[post_counter])
-            post_counter += 1
+    pre_list = []
+    post_list = []
+    action_list = []
+    code_list = []
+
+    # Walk through the file and report runs of deleted, added, and unchanged lines.
+    pre_idx = 1
+    post_idx = 1
+    while _continues(pre_idx, post_idx):
+        if pre_idx in pre_starts:
+            end = pre_idx + 1
+            while end in pre_starts and _continues(end, post_idx):
+                end += 1
+            pre_list.extend(range(pre_idx, end))
+            post_list.extend([None] * (end - pre_idx))
+            action_list.extend(['-'] * (end - pre_idx))
+            code_list.extend(deleted_lines[i] for i in range(pre_idx, end))
+            pre_idx = end
+        elif post_idx in post_starts:
+            end = post_idx + 1
+            while end in post_starts and _continues(pre_idx, end):
+                end += 1
+            pre_list.extend([None] * (end - post_idx))
+            post_list.extend(range(post_idx, end))
+            action_list.extend(['+'] * (end - post_idx))
+            code_list.extend(added_lines[i] for i in range(post_idx, end))
+            post_idx = end
         else:
-            pre_line_no.append(pre_counter)
-            post_line_no.append(post_counter)
-            action.append(None)
-            code.append(post_source_code[post_counter - 1])
-            pre_counter += 1
-            post_counter += 1
-
-    df = pd.DataFrame({'pre': pre_line_no, 'post': post_line_no, 'action': action, 'code': code})
+            n = 1
+            while (pre_idx + n) not in pre_starts and (post_idx + n) not in post_starts and \
+                  _continues(pre_idx + n, post_idx + n):
+                n += 1
+            pre_list.extend(range(pre_idx, pre_idx + n))
+            post_list.extend(range(post_idx, post_idx + n))
+            action_list.extend([None] * n)
+            code_list.extend(post_source_code[i - 1] for i in range(post_idx, post_idx + n))
+            pre_idx += n
+            post_idx += n
+
+    df = pd.DataFrame({'pre': pre_list, 'post': post_list, 'action': action_list,
+                       'code': code_list})
 
     return df
 
@@ -1417,7 +1821,7 @@ def mining_state_summary(repo_string, sqlite_db_file):
     return u_commits_info
 
 def mine_git_repo(repo_string, sqlite_db_file, use_blocks=False,
-                  no_of_processes=os.cpu_count(), chunksize=1, exclude=[], blame_C='-C',
+                  no_of_processes=os.cpu_count(), chunksize=None, exclude=[], blame_C='-C',
                   max_modifications=0, timeout=0, commits=None, extract_text=False):
     """ Creates sqlite database with details on commits and edits for a given git repository.
 
@@ -1426,7 +1830,8 @@ def mine_git_repo(repo_string, sqlite_db_file, use_blocks=False,
         sqlite_db_file: path (including database name) where the sqlite database will be created
         use_blocks: bool, determins if analysis is performed on block or line basis
         no_of_processes: number of parallel processes that are spawned
-        chunksize: number of tasks that are assigned to a process at a time
+        chunksize: number of tasks that are assigned to a process at a time, by default every
+                   process is assigned about four chunks
         exclude: file paths that are excluded from the analysis
         blame_C: string for the blame C option
         max_modifications: ignore commit if there are more modifications
@@ -1444,6 +1849,11 @@ def mine_git_repo(repo_string, sqlite_db_file, use_blocks=False,
                         "git2net. Please update to git >= 2.0.")
 
     git_repo = pydriller.GitRepository(repo_string)
+
+    # The commits are listed only once and only their hashes are kept.
+    all_commits = [c.hash for c in git_repo.get_list_commits()]
+    c_commits = frozenset(all_commits)
+
     if os.path.exists(sqlite_db_file):
         try:
             with sqlite3.connect(sqlite_db_file) as con:
@@ -1458,12 +1868,10 @@ def mine_git_repo(repo_string, sqlite_db_file, use_blocks=False,
                    (prev_repository == repo_string) and \
                    (prev_extract_text == str(extract_text)):
                     try:
-                        p_commits = set(x[0]
+                        p_commits = frozenset(x[0]
                             for x in con.execute("SELECT hash FROM commits").fetchall())
                     except sqlite3.OperationalError:
-                        p_commits = set()
-                    c_commits = set(c.hash
-                        for c in pydriller.GitRepository(repo_string).get_list_commits())
+                        p_commits = frozenset()
                     if not p_commits.issubset(c_commits):
                         raise Exception("Found a database that was created with identical " +
                                         "settings. However, some commits in the database are not " +
@@ -1511,17 +1919,17 @@ def mine_git_repo(repo_string, sqlite_db_file, use_blocks=False,
                          'method': 'blocks' if use_blocks else 'lines',
                          'extract_text': str(extract_text)})
             con.commit()
-            p_commits = []
+            p_commits = frozenset()
+
+    with sqlite3.connect(sqlite_db_file) as con:
+        _create_tables(con, extract_text=extract_text)
 
     if commits is None:
-        u_commits = [c for c in git_repo.get_list_commits() if c.hash not in p_commits]
+        u_commits = [h for h in all_commits if h not in p_commits]
     else:
-        c_commits = set(c.hash
-                        for c in pydriller.GitRepository(repo_string).get_list_commits())
-        if not set(commits).issubset(c_commits):
+        if not c_commits.issuperset(commits):
             raise Exception("At least one provided commit does not exist in the repository.")
-        commits = [git_repo.get_commit(h) for h in commits]
-        u_commits = [c for c in commits if c.hash not in p_commits]
+        u_commits = [h for h in commits if h not in p_commits]
 
     if no_of_processes > 1:
         _process_repo_parallel(repo_string=repo_string, sqlite_db_file=sqlite_db_file,
@@ -1536,3 +1944,8 @@ def mine_git_repo(repo_string, sqlite_db_file, use_blocks=False,
                              no_of_processes=no_of_processes, exclude=exclude,
                              blame_C=blame_C, max_modifications=max_modifications, timeout=timeout,
                              extract_text=extract_text)
+
+    # Indices are created once all data is written as this is faster than updating them.
+    con = sqlite3.connect(sqlite_db_file)
+    _create_indices(con)
+    con.close()
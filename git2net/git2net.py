@@ -42,8 +42,9 @@ if __name__ == "__main__":
     mine.add_argument('--numprocesses',
         help='Number of CPU cores used for multi-core processing. Defaults to number of CPU cores.',
         default=os.cpu_count(), type=int, dest='numprocesses')
-    mine.add_argument('--chunksize', help='Chunk size to be used in multiprocessing mapping.',
-        default=1, type=int, dest='chunksize')
+    mine.add_argument('--chunksize', help='Chunk size to be used in multiprocessing mapping. ' +
+        'Defaults to assigning about four chunks to every process.',
+        default=None, type=int, dest='chunksize')
     mine.add_argument('--exclude', help='Exclude path prefixes in given file.', type=str,
         default=None, dest='exclude')
     mine.add_argument('--blame-C', help="Git blame -C option. To not use -C provide ''", type=str,
@@ -9,12 +9,50 @@ import pandas as pd
 from .extraction import identify_file_renaming
 import pathpy as pp
 import sqlite3
-import datetime
 from tqdm import tqdm
 import math
-import numpy as np
 import calendar
 
+def _to_unix_time(time, timezone):
+    """ Converts commit dates and their timezone offsets to unix timestamps.
+
+    Args:
+        time: pandas series of dates in format '%Y-%m-%d %H:%M:%S'
+        timezone: pandas series of timezone offsets in seconds
+
+    Returns:
+        unix_time: pandas series of unix timestamps, NaN for missing dates
+    """
+    time = pd.to_datetime(time, format='%Y-%m-%d %H:%M:%S')
+    unix_time = (time - pd.Timestamp(0)) // pd.Timedelta(seconds=1) - timezone
+    return unix_time
+
+
+def _time_window_condition(time_from, time_to):
+    """ Creates SQL condition selecting commits authored within a given time window. Time is
+        compared in UTC, i.e. after correcting the author date for the author's timezone.
+
+    Args:
+        time_from: start time of time window filter, datetime object or None
+        time_to: end time of time window filter, datetime object or None
+
+    Returns:
+        condition: SQL condition on the columns of the commits table
+        params: parameters required by the condition
+    """
+    unix_time = "(CAST(strftime('%s', commits.author_date) AS INTEGER) - commits.author_timezone)"
+    conditions = ['1']
+    params = {}
+    if time_from is not None:
+        conditions.append(unix_time + ' >= :time_from')
+        params['time_from'] = int(calendar.timegm(time_from.timetuple()))
+    if time_to is not None:
+        conditions.append(unix_time + ' <= :time_to')
+        params['time_to'] = int(calendar.timegm(time_to.timetuple()))
+    condition = ' AND '.join(conditions)
+    return condition, params
+
+
 def get_line_editing_paths(sqlite_db_file, repo_string, commit_hashes=None, file_paths=None,
                            with_start=False, merge_renaming=False):
     """ Returns line editing DAG as well as line editing paths.
@@ -251,39 +289,28 @@ def get_commit_editing_paths(sqlite_db_file, time_from=None, time_to=None, filen
         edge_info: info on edge characteristics
     """
 
+    # Edits outside of the time window are already excluded by the database.
+    time_condition, params = _time_window_condition(time_from, time_to)
+
     con = sqlite3.connect(sqlite_db_file)
     data = pd.read_sql("""SELECT edits.original_commit_deletion AS pre_commit,
                                  edits.commit_hash AS post_commit,
-                                 edits.filename,
-                                 commits.author_date AS time,
-                                 commits.author_timezone as timezone
+                                 edits.filename
                           FROM edits
                           JOIN commits
-                          ON edits.commit_hash = commits.hash""", con).drop_duplicates()
+                          ON edits.commit_hash = commits.hash
+                          WHERE {}
+                          ORDER BY edits.rowid""".format(time_condition),
+                       con, params=params).drop_duplicates()
     if filename is not None:
         data = data.loc[data.filename==filename, :]
 
-    data['time'] = (pd.to_datetime(data.time, format='%Y-%m-%d %H:%M:%S').values.astype(int)/1e9 - \
-                    data.timezone).astype(int)
-
-    data = data.drop(['timezone'], axis=1)
-
-    if time_from == None:
-        time_from = min(data.time)
-    else:
-        time_from = int(calendar.timegm(time_from.timetuple()))
-    if time_to == None:
-        time_to = max(data.time)
-    else:
-        time_to = int(calendar.timegm(time_to.timetuple()))
-
     node_info = {}
     edge_info = {}
 
     dag = pp.DAG()
-    for idx, row in data.iterrows():
-        if (row.time >= time_from) and (row.time <= time_to):
-            dag.add_edge(row.pre_commit, row.post_commit)
+    for pre_commit, post_commit in zip(data.pre_commit, data.post_commit):
+        dag.add_edge(pre_commit, post_commit)
 
     dag.topsort()
 
@@ -311,11 +338,18 @@ def get_coediting_network(db_location, time_from=None, time_to=None):
         edge_info: info on edge characteristics
     """
 
+    # Edits outside of the time window are already excluded by the database.
+    time_condition, params = _time_window_condition(time_from, time_to)
+
     con = sqlite3.connect(db_location)
     edits = pd.read_sql("""SELECT original_commit_deletion AS pre_commit,
                                   commit_hash AS post_commit,
                                   levenshtein_dist
-                           FROM edits""", con).drop_duplicates()
+                           FROM edits
+                           WHERE commit_hash IN (SELECT hash
+                                                 FROM commits
+                                                 WHERE {})""".format(time_condition),
+                        con, params=params).drop_duplicates()
     commits = pd.read_sql("""SELECT hash, author_name, author_date, author_timezone
                              FROM commits""", con)
 
@@ -327,32 +361,19 @@ def get_coediting_network(db_location, time_from=None, time_to=None):
                     .drop(['post_commit', 'hash'], axis=1)
     data.columns = ['levenshtein_dist', 'pre_author', 'post_author', 'time', 'timezone']
 
-    data['time'] = (pd.to_datetime(data.time, format='%Y-%m-%d %H:%M:%S').values.astype(int)/1e9 - \
-                    data.timezone).astype(int)
+    data['time'] = _to_unix_time(data.time, data.timezone)
 
     data = data[['pre_author', 'post_author', 'time', 'levenshtein_dist']]
 
-    if time_from == None:
-        time_from = min(data.time)
-    else:
-        time_from = int(calendar.timegm(time_from.timetuple()))
-    if time_to == None:
-        time_to = max(data.time)
-    else:
-        time_to = int(calendar.timegm(time_to.timetuple()))
-
     node_info = {}
     edge_info = {}
 
+    data = data.loc[(data.post_author != data.pre_author) &
+                    data.post_author.notnull() & data.pre_author.notnull(), :]
+
     t = pp.TemporalNetwork()
-    for idx, row in data.iterrows():
-        if (row.time >= time_from) and (row.time <= time_to) and not \
-           (row['post_author'] == row['pre_author']):
-            if not (pd.isnull(row['post_author']) or pd.isnull(row['pre_author'])):
-                t.add_edge(row['post_author'],
-                           row['pre_author'],
-                           row['time'],
-                           directed=True)
+    for post_author, pre_author, time in zip(data.post_author, data.pre_author, data.time):
+        t.add_edge(post_author, pre_author, time, directed=True)
 
     return t, node_info, edge_info
 
@@ -374,40 +395,31 @@ def get_coauthorship_network(sqlite_db_file, time_from=None, time_to=None):
         edge_info: info on edge characteristics
     """
 
+    # Commits outside of the time window are already excluded by the database.
+    time_condition, params = _time_window_condition(time_from, time_to)
+
     con = sqlite3.connect(sqlite_db_file)
+    commits = pd.read_sql("""SELECT hash, author_name
+                             FROM commits
+                             WHERE {}""".format(time_condition), con, params=params)
     edits = pd.read_sql("""SELECT original_commit_deletion AS pre_commit,
                                   commit_hash AS post_commit,
                                   filename
-                           FROM edits""", con)
-    commits = pd.read_sql("""SELECT hash, author_name, author_date AS time,
-                                    author_timezone AS timezone
-                             FROM commits""", con)
-
-    data_pre = pd.merge(edits, commits, how='left', left_on='pre_commit', right_on='hash') \
+                           FROM edits
+                           WHERE original_commit_deletion IN (SELECT hash
+                                                              FROM commits
+                                                              WHERE {0})
+                              OR commit_hash IN (SELECT hash
+                                                 FROM commits
+                                                 WHERE {0})""".format(time_condition),
+                        con, params=params)
+
+    data_pre = pd.merge(edits, commits, how='inner', left_on='pre_commit', right_on='hash') \
                     .drop(['pre_commit', 'post_commit', 'hash'], axis=1)
-    data_post = pd.merge(edits, commits, how='left', left_on='post_commit', right_on='hash') \
+    data_post = pd.merge(edits, commits, how='inner', left_on='post_commit', right_on='hash') \
                     .drop(['pre_commit', 'post_commit', 'hash'], axis=1)
     data = pd.concat([data_pre, data_post])
 
-    data['time'] = [int(calendar.timegm(datetime.datetime.strptime(t,
-                                                                '%Y-%m-%d %H:%M:%S').timetuple())
-                    -tz) if not pd.isnull(t) else np.nan
-                    for t, tz in zip(data.time,data.timezone)]
-    data = data.drop(['timezone'], axis=1)
-
-    all_times = [dt for dt in data.time if not pd.isnull(dt)]
-    if time_from == None:
-        time_from = min(all_times)
-    else:
-        time_from = int(calendar.timegm(time_from.timetuple()))
-    if time_to == None:
-        time_to = max(all_times)
-    else:
-        time_to = int(calendar.timegm(time_to.timetuple()))
-
-    data = data.loc[data['time'] >= time_from, :]
-    data = data.loc[data['time'] <= time_to, :]
-
     node_info = {}
     edge_info = {}
 
@@ -440,43 +452,37 @@ def get_bipartite_network(sqlite_db_file, time_from=None, time_to=None):
         edge_info: info on edge characteristics
     """
 
+    # Commits outside of the time window are already excluded by the database.
+    time_condition, params = _time_window_condition(time_from, time_to)
+
     con = sqlite3.connect(sqlite_db_file)
     edits = pd.read_sql("""SELECT commit_hash AS post_commit,
                                   filename
-                           FROM edits""", con).drop_duplicates()
+                           FROM edits
+                           WHERE commit_hash IN (SELECT hash
+                                                 FROM commits
+                                                 WHERE {})""".format(time_condition),
+                        con, params=params).drop_duplicates()
 
     commits = pd.read_sql("""SELECT hash, author_name, author_date AS time,
                                     author_timezone as timezone
-                             FROM commits""", con)
+                             FROM commits
+                             WHERE {}""".format(time_condition), con, params=params)
 
-    data = pd.merge(edits, commits, how='left', left_on='post_commit', right_on='hash') \
+    data = pd.merge(edits, commits, how='inner', left_on='post_commit', right_on='hash') \
                         .drop(['post_commit', 'hash'], axis=1)
 
-    data['time'] = [int(calendar.timegm(datetime.datetime.strptime(t,
-                                                                '%Y-%m-%d %H:%M:%S').timetuple())
-                    -tz) if not pd.isnull(t) else np.nan
-                    for t, tz in zip(data.time,data.timezone)]
+    data['time'] = _to_unix_time(data.time, data.timezone)
     data = data.drop(['timezone'], axis=1)
 
-    all_times = [dt for dt in data.time if not pd.isnull(dt)]
-    if time_from == None:
-        time_from = min(all_times)
-    else:
-        time_from = int(calendar.timegm(time_from.timetuple()))
-    if time_to == None:
-        time_to = max(all_times)
-    else:
-        time_to = int(calendar.timegm(time_to.timetuple()))
-
     node_info = {}
     edge_info = {}
 
     node_info['class'] = {}
     t = pp.TemporalNetwork()
-    for idx, row in data.iterrows():
-        if (row.time >= time_from) and (row.time <= time_to):
-            t.add_edge(row['author_name'], row['filename'], row['time'], directed=True)
-            node_info['class'][row['author_name']] = 'author'
-            node_info['class'][row['filename']] = 'file'
+    for author_name, filename, time in zip(data.author_name, data.filename, data.time):
+        t.add_edge(author_name, filename, time, directed=True)
+        node_info['class'][author_name] = 'author'
+        node_info['class'][filename] = 'file'
 
     return t, node_info, edge_info
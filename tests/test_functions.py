@@ -106,6 +106,14 @@ def test_get_unified_changes(repo_string):
     assert list(unified_changes.code) == expected_code
 
 
+def test_get_unified_changes_only_additions(repo_string):
+    commit_hash = 'b17c2c321ce8d299de3d063ca0a1b0b363477505'
+    filename = 'first_lines.txt'
+    unified_changes = git2net.get_unified_changes(repo_string, commit_hash, filename)
+    assert list(unified_changes.action) == ['+', '+']
+    assert list(unified_changes.code) == ['A0', 'A1']
+
+
 def test_mine_git_repo(repo_string, sqlite_db_file):
     if os.path.exists(sqlite_db_file):
         os.remove(sqlite_db_file)
@@ -228,3 +236,23 @@ def test_process_commit_merge2(repo_string):
 
     assert list(res_dict['edits']['edit_type']) == ['replacement']*6
     assert list(res_dict['edits']['pre_starting_line_no']) == [1,2,3,1,2,3]
+
+
+def test_text_entropy():
+    assert git2net.text_entropy('') is None
+    assert git2net.text_entropy('aaaa') == 0
+    assert git2net.text_entropy('abab') == pytest.approx(1)
+    assert git2net.text_entropy('abcd') == pytest.approx(2)
+    # characters outside of the considered alphabet are ignored
+    assert git2net.text_entropy('ab€') == pytest.approx(1)
+
+
+def test_process_commit_exclude_paths(repo_string):
+    commit_hash = 'f343ed53ee64717f85135c4b8d3f6bd018be80ad'
+    args = {'repo_string': repo_string, 'commit_hash': commit_hash, 'use_blocks': False,
+             'exclude_paths': ['text_file.txt'], 'blame_C': '-C', 'timeout': 0,
+             'max_modifications': 0, 'no_of_processes': 4, 'extract_text': False}
+    res_dict = git2net.extraction._process_commit(args)
+
+    assert res_dict['edits'].empty
+    assert len(res_dict['commit']) == 1